@@ -8,79 +8,176 @@ actuator endpoints, and publishes them to CloudWatch for cluster monitoring.
 import json
 import logging
 import os
+import re
+import threading
+import time
 import boto3
-import urllib.request
-import urllib.error
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import urllib3
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# Runner probes and ECS discovery are I/O bound (mostly socket wait), so fan them out across threads
+DEFAULT_FETCH_CONCURRENCY = 32
+DISCOVERY_CONCURRENCY = 16
+
+# Shared across invocations so keep-alive connections to runner tasks are reused. Separate
+# connect/read timeouts let an unreachable IP fail fast without cutting short a slow response.
+_http_pool = urllib3.PoolManager(
+    num_pools=64,
+    maxsize=DEFAULT_FETCH_CONCURRENCY,
+    timeout=urllib3.Timeout(connect=1.5, read=3.0),
+    retries=False
+)
+
+# Actuator endpoints to probe on each runner IP, in order of preference
+ENDPOINT_PATTERNS = [
+    ('actuator/info', 8080),
+    ('metrics', 8000),
+    ('actuator/metrics', 8080),
+    ('actuator/health', 8080),
+]
+
+# Fields a runner response must carry at least one of to be worth publishing. Endpoints such as
+# actuator/health answer 200 without them, which would otherwise be reported as a stopped runner.
+SATURATION_METRIC_KEYS = frozenset({'activeTaskCount', 'activeRequestCount', 'openSessionsCount', 'agentStatus'})
+
+# Count metrics published per runner: (runner response field, CloudWatch metric name)
+COUNT_METRICS = (
+    ('activeTaskCount', 'ActiveTaskCount'),        # primary saturation indicator
+    ('activeRequestCount', 'ActiveRequestCount'),  # queue saturation indicator
+    ('openSessionsCount', 'OpenSessionsCount'),    # connection saturation indicator
+)
+
+# Head start given to in-flight probes before the next candidate is raced against them
+# (happy-eyeballs style). A healthy runner answers well within it, so normally only one
+# probe is sent, while an unreachable IP no longer holds up the rest for its full timeout.
+PROBE_STAGGER_SECONDS = 0.25
+
+# Last (ip_type, path, port) that answered for each agent ID. A runner's network placement and
+# actuator layout are stable, so that exact probe is tried first on later invocations until the
+# entry goes stale - in hybrid mode this skips an unreachable public IP as well as dead endpoints.
+ENDPOINT_CACHE_TTL_SECONDS = 900
+_endpoint_cache: Dict[str, Tuple[float, Tuple[str, str, int]]] = {}
+
+# PutMetricData accepts up to 1000 datums and 1 MB per request
+MAX_METRIC_DATA_PER_REQUEST = 1000
+MAX_METRIC_PAYLOAD_BYTES = 900_000  # Headroom below the 1 MB request limit
+
+# AGENT_ID by task definition ARN. Revisions are immutable, so entries stay valid for the life of
+# a warm Lambda container; the LRU bound keeps revision churn from growing it without limit.
+TASK_DEFINITION_CACHE_SIZE = 512
+_task_definition_agent_ids: "OrderedDict[str, Optional[str]]" = OrderedDict()
+_task_definition_lock = threading.Lock()
+
+# Discovery threads share each client, so its connection pool must not be smaller than the fan-out
+# (botocore defaults to 10). Adaptive retries back off client-side when ECS throttles the
+# low-TPS List*/Describe* APIs instead of failing the cluster outright. PutMetricData bodies are
+# highly repetitive (dimension and metric names), so botocore gzips any over 1 KB rather than
+# only those over its 10 KB default.
+_boto_config = Config(
+    max_pool_connections=2 * DISCOVERY_CONCURRENCY,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=2,
+    read_timeout=8,
+    request_min_compression_size_bytes=1024
+)
+
+# boto3 clients by service name, built on first use and reused by later warm invocations so the
+# credential chain, endpoint resolver and service model are only loaded once per container.
+# Clients are thread-safe, so the fan-out threads share them. They all come from one session so
+# the role credentials are resolved once and shared instead of once per client.
+_aws_session: Optional[boto3.session.Session] = None
+_aws_clients: Dict[str, Any] = {}
+_aws_clients_lock = threading.Lock()
+
+# ENI attachment detail names mapped to the IP slot they fill in _get_task_ips
+TASK_IP_DETAIL_KEYS = {'privateIPv4Address': 'private', 'publicIPv4Address': 'public'}
+
+# ECS Describe* APIs reject requests with more identifiers than these
+DESCRIBE_SERVICES_BATCH_SIZE = 10
+DESCRIBE_TASKS_BATCH_SIZE = 100
+
+
+def _get_client(service_name: str):
+    """Return the shared boto3 client for a service, creating it on first use"""
+    global _aws_session
+    client = _aws_clients.get(service_name)
+    if client is None:
+        with _aws_clients_lock:
+            client = _aws_clients.get(service_name)
+            if client is None:
+                if _aws_session is None:
+                    # Lambda always sets AWS_REGION; pinning it skips region lookup in the config chain
+                    _aws_session = boto3.session.Session(region_name=os.environ.get('AWS_REGION'))
+                client = _aws_session.client(service_name, config=_boto_config)
+                _aws_clients[service_name] = client
+    return client
+
+
+def _batched(items: List[Any], size: int):
+    """Yield consecutive slices of at most `size` items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _chunk_metric_data(metric_data: List[Dict[str, Any]]):
+    """Yield MetricData slices that fit within the PutMetricData request limits"""
+    for chunk in _batched(metric_data, MAX_METRIC_DATA_PER_REQUEST):
+        yield from _split_oversized_chunk(chunk)
+
+
+def _split_oversized_chunk(chunk: List[Dict[str, Any]]):
+    """Halve a chunk until its serialized size is under the payload limit"""
+    if len(chunk) > 1 and len(json.dumps(chunk, default=str)) > MAX_METRIC_PAYLOAD_BYTES:
+        middle = len(chunk) // 2
+        yield from _split_oversized_chunk(chunk[:middle])
+        yield from _split_oversized_chunk(chunk[middle:])
+    else:
+        yield chunk
+
 
 class ECSRunnerSaturationMonitor:
     def __init__(self):
-        self.ecs = boto3.client('ecs')
-        self.ec2 = boto3.client('ec2')
-        self.cloudwatch = boto3.client('cloudwatch')
+        self.ecs = _get_client('ecs')
+        self.ec2 = _get_client('ec2')
+        self.cloudwatch = _get_client('cloudwatch')
         self.cloudwatch_namespace = 'ECS/RunnerSaturation'
 
+        # Get runner indicators from environment variable, fallback to defaults.
+        # Includes "agent" alongside "runner" for backward-compat discovery of older deployments.
+        indicators_env = os.environ.get('RUNNER_SERVICE_INDICATORS', 'matillion,runner,agent,dpc')
+        self.runner_service_indicators = tuple(indicator.strip().lower() for indicator in indicators_env.split(','))
+        # One case-insensitive pass over each service name instead of a substring check per indicator
+        self._runner_service_pattern = re.compile(
+            '|'.join(map(re.escape, self.runner_service_indicators)), re.IGNORECASE
+        )
+
     def discover_runner_services(self) -> List[Dict[str, Any]]:
         """Discover ECS services running Matillion runners"""
         runner_services = []
 
         try:
             # List all ECS clusters
-            clusters_response = self.ecs.list_clusters()
-            cluster_arns = clusters_response['clusterArns']
-
-            for cluster_arn in cluster_arns:
-                cluster_name = cluster_arn.split('/')[-1]
-
-                # List services in each cluster
-                services_response = self.ecs.list_services(cluster=cluster_arn)
-                service_arns = services_response['serviceArns']
-
-                if not service_arns:
-                    continue
-
-                # Describe services to get details
-                services_detail = self.ecs.describe_services(
-                    cluster=cluster_arn,
-                    services=service_arns
-                )
+            cluster_arns = [
+                cluster_arn
+                for page in self.ecs.get_paginator('list_clusters').paginate()
+                for cluster_arn in page['clusterArns']
+            ]
 
-                for service in services_detail['services']:
-                    service_name = service['serviceName']
-
-                    # Check if this looks like a Matillion runner service
-                    if self._is_runner_service(service_name, service):
-                        # Get running tasks for this service
-                        tasks = self._get_service_tasks(cluster_arn, service['serviceArn'])
-
-                        for task in tasks:
-                            task_ips = self._get_task_ips(task)
-                            agent_id = self._extract_agent_id(task)
-
-                            runner_info = {
-                                'cluster_name': cluster_name,
-                                'cluster_arn': cluster_arn,
-                                'service_name': service_name,
-                                'service_arn': service['serviceArn'],
-                                'task_arn': task['taskArn'],
-                                'task_definition_arn': task['taskDefinitionArn'],
-                                'private_ip': task_ips['private'],
-                                'public_ip': task_ips['public'],
-                                'agent_id': agent_id
-                            }
-
-                            ip_info = f"Private: {task_ips['private']}"
-                            if task_ips['public']:
-                                ip_info += f", Public: {task_ips['public']}"
-
-                            logger.info(f"Discovered runner: {service_name} in {cluster_name}, {ip_info}, Agent ID: {agent_id}")
-                            runner_services.append(runner_info)
+            if cluster_arns:
+                # Discover clusters concurrently - every call here is an ECS API round-trip
+                max_workers = min(DISCOVERY_CONCURRENCY, len(cluster_arns))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    for cluster_runners in executor.map(self._discover_cluster_runners, cluster_arns):
+                        runner_services.extend(cluster_runners)
 
             logger.info(f"Discovered {len(runner_services)} runner tasks across {len(cluster_arns)} clusters")
             return runner_services
@@ -89,74 +186,182 @@ class ECSRunnerSaturationMonitor:
             logger.error(f"Error discovering runner services: {e}")
             return []
 
-    def _is_runner_service(self, service_name: str, service: Dict) -> bool:
-        """Determine if a service is a Matillion runner service"""
-        # Get runner indicators from environment variable, fallback to defaults.
-        # Includes "agent" alongside "runner" for backward-compat discovery of older deployments.
-        indicators_env = os.environ.get('RUNNER_SERVICE_INDICATORS', 'matillion,runner,agent,dpc')
-        indicators = [indicator.strip().lower() for indicator in indicators_env.split(',')]
-
-        service_name_lower = service_name.lower()
-        return any(indicator in service_name_lower for indicator in indicators)
+    def _discover_cluster_runners(self, cluster_arn: str) -> List[Dict[str, Any]]:
+        """Discover runner tasks in a single ECS cluster"""
+        runner_services = []
+        cluster_name = cluster_arn.split('/')[-1]
 
-    def _get_service_tasks(self, cluster_arn: str, service_arn: str) -> List[Dict]:
-        """Get running tasks for a service"""
-        try:
-            tasks_response = self.ecs.list_tasks(
+        # List services in the cluster
+        service_arns = [
+            service_arn
+            for page in self.ecs.get_paginator('list_services').paginate(
                 cluster=cluster_arn,
-                serviceName=service_arn,
-                desiredStatus='RUNNING'
+                PaginationConfig={'PageSize': 100}
             )
+            for service_arn in page['serviceArns']
+        ]
 
-            if not tasks_response['taskArns']:
-                return []
+        if not service_arns:
+            return []
 
-            # Get detailed task information
-            tasks_detail = self.ecs.describe_tasks(
+        # Describe services to get details (describe_services takes at most 10 per call)
+        services = []
+        for service_batch in _batched(service_arns, DESCRIBE_SERVICES_BATCH_SIZE):
+            services_detail = self.ecs.describe_services(
                 cluster=cluster_arn,
-                tasks=tasks_response['taskArns']
+                services=service_batch
             )
+            services.extend(services_detail['services'])
 
-            return tasks_detail['tasks']
+        # Check which services look like Matillion runner services
+        runner_services_in_cluster = [
+            service for service in services
+            if self._is_runner_service(service['serviceName'], service)
+        ]
 
-        except Exception as e:
-            logger.error(f"Error getting tasks for service {service_arn}: {e}")
+        if not runner_services_in_cluster:
             return []
 
+        # Get running tasks for the whole cluster once, grouped by owning service
+        tasks_by_service = self._get_cluster_tasks_by_service(cluster_arn)
+
+        for service in runner_services_in_cluster:
+            service_name = service['serviceName']
+            tasks = tasks_by_service.get(service_name, [])
+
+            for task in tasks:
+                task_ips = self._get_task_ips(task)
+                agent_id = self._extract_agent_id(task)
+
+                runner_info = {
+                    'cluster_name': cluster_name,
+                    'cluster_arn': cluster_arn,
+                    'service_name': service_name,
+                    'service_arn': service['serviceArn'],
+                    'task_arn': task['taskArn'],
+                    'task_definition_arn': task['taskDefinitionArn'],
+                    'private_ip': task_ips['private'],
+                    'public_ip': task_ips['public'],
+                    'agent_id': agent_id
+                }
+
+                ip_info = f"Private: {task_ips['private']}"
+                if task_ips['public']:
+                    ip_info += f", Public: {task_ips['public']}"
+
+                logger.info("Discovered runner: %s in %s, %s, Agent ID: %s",
+                            service_name, cluster_name, ip_info, agent_id)
+                runner_services.append(runner_info)
+
+        return runner_services
+
+    def _is_runner_service(self, service_name: str, service: Dict) -> bool:
+        """Determine if a service is a Matillion runner service"""
+        return self._runner_service_pattern.search(service_name) is not None
+
+    def _get_cluster_tasks_by_service(self, cluster_arn: str) -> Dict[str, List[Dict]]:
+        """Get running tasks for a cluster, keyed by the name of the service that started them"""
+        try:
+            task_arns = [
+                task_arn
+                for page in self.ecs.get_paginator('list_tasks').paginate(
+                    cluster=cluster_arn,
+                    desiredStatus='RUNNING'
+                )
+                for task_arn in page['taskArns']
+            ]
+
+            if not task_arns:
+                return {}
+
+            # Get detailed task information (describe_tasks takes at most 100 per call)
+            tasks = []
+            for task_batch in _batched(task_arns, DESCRIBE_TASKS_BATCH_SIZE):
+                tasks_detail = self.ecs.describe_tasks(
+                    cluster=cluster_arn,
+                    tasks=task_batch
+                )
+                tasks.extend(tasks_detail['tasks'])
+
+            # Service tasks carry group "service:<service name>"; standalone tasks are skipped
+            tasks_by_service = {}
+            for task in tasks:
+                group = task.get('group', '')
+                if group.startswith('service:'):
+                    tasks_by_service.setdefault(group[len('service:'):], []).append(task)
+
+            return tasks_by_service
+
+        except Exception as e:
+            logger.error(f"Error getting tasks for cluster {cluster_arn}: {e}")
+            return {}
+
     def _get_task_ips(self, task: Dict) -> Dict[str, Optional[str]]:
         """Extract both private and public IP addresses from task"""
         ips = {'private': None, 'public': None}
 
         try:
             for attachment in task.get('attachments', []):
-                if attachment['type'] == 'ElasticNetworkInterface':
-                    for detail in attachment['details']:
-                        if detail['name'] == 'privateIPv4Address':
-                            ips['private'] = detail['value']
-                        elif detail['name'] == 'publicIPv4Address':
-                            ips['public'] = detail['value']
+                if attachment.get('type') != 'ElasticNetworkInterface':
+                    continue
+                for detail in attachment['details']:
+                    ip_key = TASK_IP_DETAIL_KEYS.get(detail['name'])
+                    if ip_key:
+                        ips[ip_key] = detail['value']
         except Exception as e:
-            logger.debug(f"Could not extract IPs from task: {e}")
+            logger.debug("Could not extract IPs from task: %s", e)
 
         return ips
 
+    def _get_task_private_ip(self, task: Dict) -> Optional[str]:
+        """Extract the private IP address from the task's first ENI attachment that has one"""
+        return next(
+            (
+                detail['value']
+                for attachment in task.get('attachments', ())
+                if attachment.get('type') == 'ElasticNetworkInterface'
+                for detail in attachment.get('details', ())
+                if detail.get('name') == 'privateIPv4Address'
+            ),
+            None
+        )
+
     def _extract_agent_id(self, task: Dict) -> str:
         """Extract Matillion Agent ID from task environment variables (API contract field name) or use task ID"""
         try:
             # Try to get from task definition environment variables
-            task_def_arn = task['taskDefinitionArn']
-            task_def = self.ecs.describe_task_definition(taskDefinition=task_def_arn)
-
-            for container in task_def['taskDefinition']['containerDefinitions']:
-                for env_var in container.get('environment', []):
-                    if env_var['name'] == 'AGENT_ID':
-                        return env_var['value']
+            agent_id = self._get_task_definition_agent_id(task['taskDefinitionArn'])
+            if agent_id:
+                return agent_id
         except Exception as e:
-            logger.debug(f"Could not extract Agent ID from environment: {e}")
+            logger.debug("Could not extract Agent ID from environment: %s", e)
 
         # Fallback to task ID
         return task['taskArn'].split('/')[-1]
 
+    def _get_task_definition_agent_id(self, task_def_arn: str) -> Optional[str]:
+        """Look up AGENT_ID in a task definition, cached by ARN across warm invocations"""
+        with _task_definition_lock:
+            if task_def_arn in _task_definition_agent_ids:
+                _task_definition_agent_ids.move_to_end(task_def_arn)
+                return _task_definition_agent_ids[task_def_arn]
+
+        task_def = self.ecs.describe_task_definition(taskDefinition=task_def_arn)
+        agent_id = next(
+            (env_var['value']
+             for container in task_def['taskDefinition']['containerDefinitions']
+             for env_var in container.get('environment', [])
+             if env_var['name'] == 'AGENT_ID'),
+            None
+        )
+
+        with _task_definition_lock:
+            _task_definition_agent_ids[task_def_arn] = agent_id
+            if len(_task_definition_agent_ids) > TASK_DEFINITION_CACHE_SIZE:
+                _task_definition_agent_ids.popitem(last=False)
+
+        return agent_id
+
     def fetch_runner_metrics(self, runner_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Fetch metrics from runner actuator endpoint with smart IP selection"""
         private_ip = runner_info.get('private_ip')
@@ -185,37 +390,46 @@ class ECSRunnerSaturationMonitor:
             if private_ip:
                 ips_to_try.append(('private', private_ip))
 
-        # Try different ports and endpoints for each IP
-        endpoint_patterns = [
-            ('actuator/info', 8080),
-            ('metrics', 8000),
-            ('actuator/metrics', 8080),
-            ('actuator/health', 8080),
+        # Try different ports and endpoints for each IP, starting with the probe that last worked
+        agent_id = runner_info.get('agent_id')
+        candidates = [
+            (ip_type, ip_address, endpoint_path, port)
+            for ip_type, ip_address in ips_to_try
+            for endpoint_path, port in ENDPOINT_PATTERNS
         ]
-
-        for ip_type, ip_address in ips_to_try:
-            logger.debug(f"Trying {ip_type} IP: {ip_address}")
-
-            for endpoint_path, port in endpoint_patterns:
-                endpoint = f"http://{ip_address}:{port}/{endpoint_path}"
-
-                try:
-                    logger.debug(f"Trying endpoint: {endpoint}")
-                    req = urllib.request.Request(endpoint)
-                    with urllib.request.urlopen(req, timeout=5) as response:  # Reduced timeout for faster fallback
-                        if response.getcode() == 200:
-                            data = response.read().decode('utf-8')
-                            metrics_data = json.loads(data)
-                            logger.info(f"Fetched metrics from {endpoint} ({ip_type} IP): {metrics_data}")
-                            logger.info(f"Successfully fetched metrics from {endpoint} ({ip_type} IP)")
+        cached = _endpoint_cache.get(agent_id)
+        if cached and time.monotonic() - cached[0] < ENDPOINT_CACHE_TTL_SECONDS:
+            cached_type, cached_path, cached_port = cached[1]
+            for index, (ip_type, _, endpoint_path, port) in enumerate(candidates):
+                if (ip_type, endpoint_path, port) == (cached_type, cached_path, cached_port):
+                    candidates.insert(0, candidates.pop(index))
+                    break
+
+        if candidates:
+            executor = ThreadPoolExecutor(max_workers=len(candidates))
+            try:
+                in_flight = {}
+                queued = iter(candidates)
+                while True:
+                    candidate = next(queued, None)
+                    if candidate:
+                        in_flight[executor.submit(self._probe_endpoint, *candidate)] = candidate
+                    elif not in_flight:
+                        break
+
+                    # Wait for the first probe to finish, or until it's time to race the next candidate
+                    done, _ = wait(in_flight, timeout=PROBE_STAGGER_SECONDS if candidate else None,
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        ip_type, _, endpoint_path, port = in_flight.pop(future)
+                        metrics_data = future.result()
+                        if metrics_data is not None:
+                            if agent_id:
+                                _endpoint_cache[agent_id] = (time.monotonic(), (ip_type, endpoint_path, port))
                             return metrics_data
-                        else:
-                            logger.debug(f"HTTP {response.getcode()} from {endpoint}")
-                            continue
-
-                except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, Exception) as e:
-                    logger.debug(f"Failed to fetch from {endpoint}: {e}")
-                    continue
+            finally:
+                # Don't block on losing probes; they finish against their own timeouts
+                executor.shutdown(wait=False, cancel_futures=True)
 
         ip_summary = []
         if public_ip:
@@ -226,81 +440,105 @@ class ECSRunnerSaturationMonitor:
         logger.warning(f"Could not fetch metrics from any endpoint for task {runner_info['task_arn']} (tried IPs: {', '.join(ip_summary)})")
         return None
 
-    def publish_metrics_to_cloudwatch(self, runner_info: Dict[str, Any], metrics_data: Dict[str, Any]):
-        """Publish saturation metrics to CloudWatch"""
+    def _probe_endpoint(self, ip_type: str, ip_address: str, endpoint_path: str, port: int) -> Optional[Dict[str, Any]]:
+        """Fetch metrics from a single actuator endpoint; returns None if it doesn't answer with JSON"""
+        endpoint = f"http://{ip_address}:{port}/{endpoint_path}"
+
         try:
-            # Use task ID for unique identification of each running instance
-            task_id = runner_info['task_arn'].split('/')[-1]
-
-            dimensions = [
-                {'Name': 'ClusterName', 'Value': runner_info['cluster_name']},
-                {'Name': 'ServiceName', 'Value': runner_info['service_name']},
-                {'Name': 'TaskId', 'Value': task_id},
-                {'Name': 'RunnerId', 'Value': runner_info['agent_id']}
-            ]
+            logger.debug("Trying endpoint: %s", endpoint)
+            response = _http_pool.request('GET', endpoint)
+            if response.status == 200:
+                # json.loads detects the encoding of a bytes body itself, no separate decode pass
+                metrics_data = json.loads(response.data)
+                if not isinstance(metrics_data, dict) or SATURATION_METRIC_KEYS.isdisjoint(metrics_data):
+                    logger.debug("No saturation metrics in response from %s", endpoint)
+                    return None
+                logger.info("Fetched metrics from %s (%s IP): %s", endpoint, ip_type, metrics_data)
+                return metrics_data
+            else:
+                logger.debug("HTTP %s from %s", response.status, endpoint)
+
+        except (urllib3.exceptions.HTTPError, json.JSONDecodeError, Exception) as e:
+            logger.debug("Failed to fetch from %s: %s", endpoint, e)
+
+        return None
+
+    def build_metric_data(self, runner_info: Dict[str, Any], metrics_data: Dict[str, Any],
+                          timestamp: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Build CloudWatch MetricData entries for a runner's saturation metrics"""
+        # Use task ID for unique identification of each running instance
+        task_id = runner_info['task_arn'].split('/')[-1]
+
+        dimensions = [
+            {'Name': 'ClusterName', 'Value': runner_info['cluster_name']},
+            {'Name': 'ServiceName', 'Value': runner_info['service_name']},
+            {'Name': 'TaskId', 'Value': task_id},
+            {'Name': 'RunnerId', 'Value': runner_info['agent_id']}
+        ]
 
-            metric_data = []
-            timestamp = datetime.utcnow()
-
-            # Active Task Count - primary saturation indicator
-            if 'activeTaskCount' in metrics_data:
-                metric_data.append({
-                    'MetricName': 'ActiveTaskCount',
-                    'Value': float(metrics_data['activeTaskCount']),
-                    'Unit': 'Count',
-                    'Dimensions': dimensions,
-                    'Timestamp': timestamp
-                })
-
-            # Active Request Count - queue saturation indicator
-            if 'activeRequestCount' in metrics_data:
-                metric_data.append({
-                    'MetricName': 'ActiveRequestCount',
-                    'Value': float(metrics_data['activeRequestCount']),
-                    'Unit': 'Count',
-                    'Dimensions': dimensions,
-                    'Timestamp': timestamp
-                })
-
-            # Open Sessions Count - connection saturation indicator
-            if 'openSessionsCount' in metrics_data:
-                metric_data.append({
-                    'MetricName': 'OpenSessionsCount',
-                    'Value': float(metrics_data['openSessionsCount']),
-                    'Unit': 'Count',
-                    'Dimensions': dimensions,
-                    'Timestamp': timestamp
-                })
-
-            # Runner Status - health indicator. The actuator returns `agentStatus` (Matillion API contract).
-            agent_status = metrics_data.get('agentStatus', '')
-            runner_status_value = 1.0 if agent_status == 'RUNNING' else 0.0
-            metric_data.append({
-                'MetricName': 'RunnerStatus',
-                'Value': runner_status_value,
-                'Unit': 'None',
+        timestamp = timestamp or datetime.now(timezone.utc)
+
+        # Count metrics the runner reported; they all share the same dimensions list
+        metric_data = [
+            {
+                'MetricName': metric_name,
+                'Value': float(metrics_data[field]),
+                'Unit': 'Count',
                 'Dimensions': dimensions,
                 'Timestamp': timestamp
-            })
+            }
+            for field, metric_name in COUNT_METRICS
+            if field in metrics_data
+        ]
+
+        # Runner Status - health indicator. The actuator returns `agentStatus` (Matillion API contract).
+        agent_status = metrics_data.get('agentStatus', '')
+        runner_status_value = 1.0 if agent_status == 'RUNNING' else 0.0
+        metric_data.append({
+            'MetricName': 'RunnerStatus',
+            'Value': runner_status_value,
+            'Unit': 'None',
+            'Dimensions': dimensions,
+            'Timestamp': timestamp
+        })
+
+        # Pretty-printing every datum is costly, so only build the dump when it will be emitted
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Collected metrics for task {task_id} (agent_id {runner_info['agent_id']}): "
+                         f"{json.dumps(metric_data, indent=2, default=str)}")
+
+        return metric_data
+
+    def publish_metrics_to_cloudwatch(self, metric_data: List[Dict[str, Any]]) -> int:
+        """Publish MetricData entries to CloudWatch, batching across runners; returns the number published"""
+        if not metric_data:
+            logger.warning("No metrics to publish")
+            return 0
+
+        published = 0
+        for chunk in _chunk_metric_data(metric_data):
+            try:
+                self.cloudwatch.put_metric_data(
+                    Namespace=self.cloudwatch_namespace,
+                    MetricData=chunk
+                )
+                published += len(chunk)
+                logger.info(f"Published batch of {len(chunk)} metrics to {self.cloudwatch_namespace}")
 
-            if not metric_data:
-                logger.warning(f"No metrics to publish for task {task_id} (agent_id {runner_info['agent_id']})")
-                return
+            except Exception as e:
+                logger.error(f"Error publishing batch of {len(chunk)} metrics: {e}")
 
-            # Log the metrics being published
-            logger.info(f"Publishing metrics for task {task_id} (agent_id {runner_info['agent_id']}): {json.dumps(metric_data, indent=2, default=str)}")
+        return published
 
-            # Publish to CloudWatch
-            self.cloudwatch.put_metric_data(
-                Namespace=self.cloudwatch_namespace,
-                MetricData=metric_data
-            )
+    def _collect_runner_metrics(self, runner_info: Dict[str, Any],
+                                timestamp: datetime) -> Optional[List[Dict[str, Any]]]:
+        """Fetch metrics for a single runner and build its MetricData entries"""
+        metrics_data = self.fetch_runner_metrics(runner_info)
 
-            logger.info(f"Published {len(metric_data)} metrics for task {task_id} (agent_id {runner_info['agent_id']}) "
-                       f"in cluster {runner_info['cluster_name']}")
+        if not metrics_data:
+            return None
 
-        except Exception as e:
-            logger.error(f"Error publishing metrics for task {task_id} (agent_id {runner_info['agent_id']}): {e}")
+        return self.build_metric_data(runner_info, metrics_data, timestamp)
 
     def monitor_all_runners(self) -> Dict[str, Any]:
         """Main monitoring function - discover and monitor all runners"""
@@ -320,22 +558,33 @@ class ECSRunnerSaturationMonitor:
                 logger.info("No runner services discovered")
                 return results
 
-            # Monitor each runner
-            for runner_info in runner_services:
-                try:
-                    # Fetch metrics from runner
-                    metrics_data = self.fetch_runner_metrics(runner_info)
-
-                    if metrics_data:
-                        # Publish to CloudWatch
-                        self.publish_metrics_to_cloudwatch(runner_info, metrics_data)
-                        results['runners_monitored'] += 1
-                        results['metrics_published'] += 4  # Assuming 4 metrics per runner
-
-                except Exception as e:
-                    error_msg = f"Error monitoring runner {runner_info.get('agent_id', 'unknown')}: {e}"
-                    logger.error(error_msg)
-                    results['errors'].append(error_msg)
+            # Fetch runner metrics concurrently; results are aggregated on this thread only.
+            # Every datum in the batch shares one timestamp.
+            timestamp = datetime.now(timezone.utc)
+            all_metric_data = []
+            fetch_concurrency = max(1, int(os.environ.get('FETCH_CONCURRENCY', DEFAULT_FETCH_CONCURRENCY)))
+            max_workers = min(fetch_concurrency, len(runner_services))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(self._collect_runner_metrics, runner_info, timestamp): runner_info
+                           for runner_info in runner_services}
+
+                for future in as_completed(futures):
+                    runner_info = futures[future]
+                    try:
+                        metric_data = future.result()
+
+                        if metric_data:
+                            all_metric_data.extend(metric_data)
+                            results['runners_monitored'] += 1
+
+                    except Exception as e:
+                        error_msg = f"Error monitoring runner {runner_info.get('agent_id', 'unknown')}: {e}"
+                        logger.error(error_msg)
+                        results['errors'].append(error_msg)
+
+            # Publish every runner's metrics in as few PutMetricData calls as possible
+            if all_metric_data:
+                results['metrics_published'] = self.publish_metrics_to_cloudwatch(all_metric_data)
 
             logger.info(f"Monitoring complete: {results['runners_monitored']}/{results['runners_discovered']} "
                        f"runners monitored, {results['metrics_published']} metrics published")
@@ -129,6 +129,7 @@ resource "aws_lambda_function" "saturation_monitor" {
       LOG_LEVEL                 = var.log_level
       RUNNER_SERVICE_INDICATORS = var.runner_service_indicators
       DEPLOYMENT_MODE           = var.deployment_mode
+      FETCH_CONCURRENCY         = var.fetch_concurrency
     }
   }
 
@@ -10,6 +10,7 @@ import pytest
 import json
 import boto3
 import os
+from types import SimpleNamespace
 from moto import mock_ecs, mock_cloudwatch, mock_ec2
 from unittest.mock import patch
 
@@ -17,31 +18,29 @@ from unittest.mock import patch
 import lambda_function
 
 
-@pytest.mark.integration
-class TestECSRunnerSaturationMonitorIntegration:
-    """Integration tests using moto for AWS service mocking"""
-
-    @mock_ecs
-    @mock_cloudwatch
-    @mock_ec2
-    def test_full_workflow_with_mocked_aws(self):
-        """Test complete workflow with mocked AWS services"""
-        # Setup mocked AWS environment
+@pytest.fixture(scope='class')
+def aws_env():
+    """Mocked AWS clients plus the VPC, subnet, cluster and task definition shared by the class"""
+    with mock_ecs(), mock_cloudwatch(), mock_ec2():
         ecs_client = boto3.client('ecs', region_name='us-east-1')
         cloudwatch_client = boto3.client('cloudwatch', region_name='us-east-1')
         ec2_client = boto3.client('ec2', region_name='us-east-1')
-        
+
         # Create mock VPC and subnet
         vpc = ec2_client.create_vpc(CidrBlock='10.0.0.0/16')
         subnet = ec2_client.create_subnet(
             VpcId=vpc['Vpc']['VpcId'],
             CidrBlock='10.0.1.0/24'
         )
-        
+        security_group = ec2_client.create_security_group(
+            GroupName='matillion-agent-sg',
+            Description='Matillion agent tasks',
+            VpcId=vpc['Vpc']['VpcId']
+        )
+
         # Create mock ECS cluster
         cluster_response = ecs_client.create_cluster(clusterName='test-cluster')
-        cluster_arn = cluster_response['cluster']['clusterArn']
-        
+
         # Register task definition
         task_def_response = ecs_client.register_task_definition(
             family='matillion-agent-task',
@@ -53,37 +52,54 @@ class TestECSRunnerSaturationMonitorIntegration:
                 'name': 'matillion-agent',
                 'image': 'test-image:latest',
                 'essential': True,
+                'memory': 512,
                 'environment': [
                     {'name': 'AGENT_ID', 'value': 'test-agent-001'}
                 ]
             }]
         )
-        
+
+        yield SimpleNamespace(
+            ecs_client=ecs_client,
+            cloudwatch_client=cloudwatch_client,
+            ec2_client=ec2_client,
+            cluster_arn=cluster_response['cluster']['clusterArn'],
+            subnet_id=subnet['Subnet']['SubnetId'],
+            security_group_id=security_group['GroupId'],
+            task_def_arn=task_def_response['taskDefinition']['taskDefinitionArn']
+        )
+
+
+@pytest.mark.integration
+class TestECSRunnerSaturationMonitorIntegration:
+    """Integration tests using moto for AWS service mocking"""
+
+    def test_full_workflow_with_mocked_aws(self, aws_env):
+        """Test complete workflow with mocked AWS services"""
+        network_configuration = {
+            'awsvpcConfiguration': {
+                'subnets': [aws_env.subnet_id],
+                'securityGroups': [aws_env.security_group_id],
+                'assignPublicIp': 'DISABLED'
+            }
+        }
+
         # Create service
-        service_response = ecs_client.create_service(
-            cluster=cluster_arn,
+        aws_env.ecs_client.create_service(
+            cluster=aws_env.cluster_arn,
             serviceName='matillion-agent-service',
-            taskDefinition='matillion-agent-task:1',
+            taskDefinition=aws_env.task_def_arn,
             desiredCount=1,
-            networkConfiguration={
-                'awsvpcConfiguration': {
-                    'subnets': [subnet['Subnet']['SubnetId']],
-                    'assignPublicIp': 'DISABLED'
-                }
-            }
+            networkConfiguration=network_configuration
         )
         
         # Create a mock running task
-        task_response = ecs_client.run_task(
-            cluster=cluster_arn,
-            taskDefinition='matillion-agent-task:1',
+        aws_env.ecs_client.run_task(
+            cluster=aws_env.cluster_arn,
+            taskDefinition=aws_env.task_def_arn,
             count=1,
-            networkConfiguration={
-                'awsvpcConfiguration': {
-                    'subnets': [subnet['Subnet']['SubnetId']],
-                    'assignPublicIp': 'DISABLED'
-                }
-            }
+            launchType='FARGATE',
+            networkConfiguration=network_configuration
         )
         
         # Mock successful HTTP response for metrics endpoint
@@ -94,18 +110,18 @@ class TestECSRunnerSaturationMonitorIntegration:
             'agentStatus': 'RUNNING'
         }
         
-        with patch('urllib.request.urlopen') as mock_urlopen:
+        with patch.object(lambda_function._http_pool, 'request') as mock_request:
             # Mock HTTP response
-            mock_response = mock_urlopen.return_value.__enter__.return_value
-            mock_response.getcode.return_value = 200
-            mock_response.read.return_value = json.dumps(mock_metrics_data).encode('utf-8')
+            mock_response = mock_request.return_value
+            mock_response.status = 200
+            mock_response.data = json.dumps(mock_metrics_data).encode('utf-8')
             
             # Create monitor instance
             monitor = lambda_function.ECSRunnerSaturationMonitor()
             
             # Override AWS clients to use mocked ones
-            monitor.ecs = ecs_client
-            monitor.cloudwatch = cloudwatch_client
+            monitor.ecs = aws_env.ecs_client
+            monitor.cloudwatch = aws_env.cloudwatch_client
             
             # Run monitoring
             results = monitor.monitor_all_runners()
@@ -144,25 +160,8 @@ class TestECSRunnerSaturationMonitorIntegration:
         # For now, just test that the function is importable and callable
         assert callable(lambda_function.lambda_handler)
 
-    @mock_ecs
-    def test_ecs_service_discovery(self):
+    def test_ecs_service_discovery(self, aws_env):
         """Test ECS service discovery logic"""
-        ecs_client = boto3.client('ecs', region_name='us-east-1')
-        
-        # Create test cluster
-        cluster_response = ecs_client.create_cluster(clusterName='test-cluster')
-        cluster_arn = cluster_response['cluster']['clusterArn']
-        
-        # Register task definition
-        ecs_client.register_task_definition(
-            family='matillion-agent-task',
-            containerDefinitions=[{
-                'name': 'agent',
-                'image': 'test:latest',
-                'essential': True
-            }]
-        )
-        
         # Create services with different names
         test_services = [
             'matillion-prod-service',  # Should be discovered
@@ -173,16 +172,24 @@ class TestECSRunnerSaturationMonitorIntegration:
         ]
         
         for service_name in test_services:
-            ecs_client.create_service(
-                cluster=cluster_arn,
+            aws_env.ecs_client.create_service(
+                cluster=aws_env.cluster_arn,
                 serviceName=service_name,
-                taskDefinition='matillion-agent-task:1',
-                desiredCount=1
+                taskDefinition=aws_env.task_def_arn,
+                desiredCount=1,
+                networkConfiguration={
+                    'awsvpcConfiguration': {
+                        'subnets': [aws_env.subnet_id],
+                        'securityGroups': [aws_env.security_group_id],
+                        'assignPublicIp': 'DISABLED'
+                    }
+                }
             )
         
         # Test discovery
-        monitor = lambda_function.ECSRunnerSaturationMonitor()
-        monitor.ecs = ecs_client
+        with patch.dict(os.environ, {'RUNNER_SERVICE_INDICATORS': 'matillion,agent,dpc'}):
+            monitor = lambda_function.ECSRunnerSaturationMonitor()
+        monitor.ecs = aws_env.ecs_client
         
         # Test service identification
         for service_name in test_services:
@@ -6,6 +6,7 @@ Unit tests for ECS Runner Saturation Monitor Lambda function
 import unittest
 import json
 import os
+import time
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 
@@ -18,7 +19,16 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures"""
+        # Hand every monitor a mock per AWS service instead of a real boto3 client
+        self.aws_clients = {}
+        self.client_patcher = patch('lambda_function._get_client', autospec=True,
+                                    side_effect=lambda service_name: self.aws_clients.setdefault(
+                                        service_name, MagicMock(name=service_name)))
+        self.client_patcher.start()
+
         self.monitor = lambda_function.ECSRunnerSaturationMonitor()
+        lambda_function._task_definition_agent_ids.clear()
+        lambda_function._endpoint_cache.clear()
         
         # Mock environment variables
         self.env_patcher = patch.dict(os.environ, {
@@ -31,6 +41,7 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
     def tearDown(self):
         """Clean up after tests"""
         self.env_patcher.stop()
+        self.client_patcher.stop()
 
     def test_is_runner_service_default_indicators(self):
         """Test runner service detection with default indicators"""
@@ -78,9 +89,14 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
             }
         }
         
-        with patch.object(self.monitor.ecs, 'describe_task_definition', return_value=mock_task_def):
+        with patch.object(self.monitor.ecs, 'describe_task_definition', return_value=mock_task_def) as mock_describe:
+            agent_id = self.monitor._extract_agent_id(mock_task)
+            self.assertEqual(agent_id, 'test-agent-001')
+
+            # Tasks sharing a task definition revision reuse the cached lookup
             agent_id = self.monitor._extract_agent_id(mock_task)
             self.assertEqual(agent_id, 'test-agent-001')
+            self.assertEqual(mock_describe.call_count, 1)
 
     def test_extract_agent_id_fallback_to_task_id(self):
         """Test agent ID fallback to task ID when environment variable not found"""
@@ -101,6 +117,53 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
             agent_id = self.monitor._extract_agent_id(mock_task)
             self.assertEqual(agent_id, 'abc123def456')
 
+    def test_get_cluster_tasks_by_service(self):
+        """Test running tasks are listed once per cluster and grouped by service"""
+        cluster_arn = 'arn:aws:ecs:region:account:cluster/test-cluster'
+        mock_paginator = Mock()
+        mock_paginator.paginate.return_value = [{'taskArns': ['task1', 'task2', 'task3']}]
+        mock_tasks = {
+            'tasks': [
+                {'taskArn': 'task1', 'group': 'service:matillion-runner'},
+                {'taskArn': 'task2', 'group': 'service:matillion-runner'},
+                {'taskArn': 'task3', 'group': 'family:standalone'}
+            ]
+        }
+
+        with patch.object(self.monitor.ecs, 'get_paginator', return_value=mock_paginator), \
+             patch.object(self.monitor.ecs, 'describe_tasks', return_value=mock_tasks) as mock_describe:
+            tasks_by_service = self.monitor._get_cluster_tasks_by_service(cluster_arn)
+
+        mock_paginator.paginate.assert_called_once_with(cluster=cluster_arn, desiredStatus='RUNNING')
+        mock_describe.assert_called_once_with(cluster=cluster_arn, tasks=['task1', 'task2', 'task3'])
+        self.assertEqual(list(tasks_by_service), ['matillion-runner'])
+        self.assertEqual([task['taskArn'] for task in tasks_by_service['matillion-runner']], ['task1', 'task2'])
+
+    def test_discover_batches_describe_services(self):
+        """Test services are described in batches of 10 after paginated listing"""
+        cluster_arn = 'arn:aws:ecs:region:account:cluster/test-cluster'
+        service_arns = [f'arn:aws:ecs:region:account:service/test-cluster/web-{i}' for i in range(25)]
+        pages = {
+            'list_clusters': [{'clusterArns': [cluster_arn]}],
+            'list_services': [{'serviceArns': service_arns[:20]}, {'serviceArns': service_arns[20:]}]
+        }
+
+        def get_paginator(operation_name):
+            paginator = Mock()
+            paginator.paginate.return_value = pages[operation_name]
+            return paginator
+
+        def describe_services(cluster, services):
+            return {'services': [{'serviceName': arn.split('/')[-1], 'serviceArn': arn} for arn in services]}
+
+        with patch.object(self.monitor.ecs, 'get_paginator', side_effect=get_paginator), \
+             patch.object(self.monitor.ecs, 'describe_services', side_effect=describe_services) as mock_describe:
+            runner_services = self.monitor.discover_runner_services()
+
+        self.assertEqual(runner_services, [])  # No web-* service is a runner
+        batch_sizes = [len(call[1]['services']) for call in mock_describe.call_args_list]
+        self.assertEqual(batch_sizes, [10, 10, 5])
+
     def test_get_task_private_ip(self):
         """Test private IP extraction from ECS task"""
         mock_task = {
@@ -129,20 +192,20 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
         private_ip = self.monitor._get_task_private_ip(mock_task)
         self.assertIsNone(private_ip)
 
-    @patch('urllib.request.urlopen')
-    def test_fetch_runner_metrics_success(self, mock_urlopen):
+    @patch.object(lambda_function._http_pool, 'request')
+    def test_fetch_runner_metrics_success(self, mock_request):
         """Test successful metrics fetching"""
         # Mock HTTP response
         mock_response = MagicMock()
-        mock_response.getcode.return_value = 200
-        mock_response.read.return_value = json.dumps({
+        mock_response.status = 200
+        mock_response.data = json.dumps({
             'activeTaskCount': 5,
             'activeRequestCount': 3,
             'openSessionsCount': 10,
             'agentStatus': 'RUNNING'
         }).encode('utf-8')
         
-        mock_urlopen.return_value.__enter__.return_value = mock_response
+        mock_request.return_value = mock_response
         
         runner_info = {
             'private_ip': '10.0.1.100',
@@ -157,11 +220,62 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
         self.assertEqual(metrics['openSessionsCount'], 10)
         self.assertEqual(metrics['agentStatus'], 'RUNNING')
 
-    @patch('urllib.request.urlopen')
-    def test_fetch_runner_metrics_failure(self, mock_urlopen):
+    @patch.object(lambda_function._http_pool, 'request')
+    def test_fetch_runner_metrics_tries_cached_endpoint_first(self, mock_request):
+        """Test that the endpoint which last answered is probed first on the next fetch"""
+        def respond(method, url):
+            response = MagicMock()
+            response.status = 200 if url.endswith(':8080/actuator/metrics') else 404
+            response.data = json.dumps({'activeTaskCount': 5}).encode('utf-8')
+            return response
+
+        mock_request.side_effect = respond
+
+        runner_info = {
+            'private_ip': '10.0.1.100',
+            'task_arn': 'arn:aws:ecs:region:account:task/cluster/abc123',
+            'agent_id': 'agent-001'
+        }
+
+        self.assertIsNotNone(self.monitor.fetch_runner_metrics(runner_info))
+        self.assertEqual(mock_request.call_count, 3)
+
+        mock_request.reset_mock()
+        self.assertIsNotNone(self.monitor.fetch_runner_metrics(runner_info))
+        mock_request.assert_called_once_with('GET', 'http://10.0.1.100:8080/actuator/metrics')
+
+    @patch.object(lambda_function._http_pool, 'request')
+    def test_fetch_runner_metrics_hybrid_skips_unreachable_public_ip(self, mock_request):
+        """Test the cached probe remembers which IP answered, not just the endpoint"""
+        def respond(method, url):
+            if '54.0.0.1' in url:
+                raise lambda_function.urllib3.exceptions.ConnectTimeoutError('timed out')
+            response = MagicMock()
+            response.status = 200 if url.endswith(':8080/actuator/info') else 404
+            response.data = json.dumps({'activeTaskCount': 5}).encode('utf-8')
+            return response
+
+        mock_request.side_effect = respond
+
+        runner_info = {
+            'private_ip': '10.0.1.100',
+            'public_ip': '54.0.0.1',
+            'task_arn': 'arn:aws:ecs:region:account:task/cluster/abc123',
+            'agent_id': 'agent-001'
+        }
+
+        with patch.dict(os.environ, {'DEPLOYMENT_MODE': 'hybrid'}):
+            self.assertIsNotNone(self.monitor.fetch_runner_metrics(runner_info))
+
+            mock_request.reset_mock()
+            self.assertIsNotNone(self.monitor.fetch_runner_metrics(runner_info))
+        mock_request.assert_called_once_with('GET', 'http://10.0.1.100:8080/actuator/info')
+
+    @patch.object(lambda_function._http_pool, 'request')
+    def test_fetch_runner_metrics_failure(self, mock_request):
         """Test metrics fetching failure"""
         # Mock HTTP error
-        mock_urlopen.side_effect = Exception("Connection refused")
+        mock_request.side_effect = Exception("Connection refused")
         
         runner_info = {
             'private_ip': '10.0.1.100',
@@ -171,6 +285,28 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
         metrics = self.monitor.fetch_runner_metrics(runner_info)
         self.assertIsNone(metrics)
 
+    @patch.object(lambda_function._http_pool, 'request')
+    def test_fetch_runner_metrics_skips_response_without_metrics(self, mock_request):
+        """Test a 200 response without saturation fields doesn't end endpoint probing"""
+        def respond(method, url):
+            response = Mock()
+            response.status = 200
+            if url.endswith(':8000/metrics'):
+                response.data = json.dumps({'activeTaskCount': 5}).encode('utf-8')
+            else:
+                response.data = json.dumps({'status': 'UP'}).encode('utf-8')
+            return response
+
+        mock_request.side_effect = respond
+
+        runner_info = {
+            'private_ip': '10.0.1.100',
+            'task_arn': 'arn:aws:ecs:region:account:task/cluster/abc123'
+        }
+
+        metrics = self.monitor.fetch_runner_metrics(runner_info)
+        self.assertEqual(metrics, {'activeTaskCount': 5})
+
     def test_fetch_runner_metrics_no_private_ip(self):
         """Test metrics fetching with no private IP"""
         runner_info = {
@@ -181,12 +317,12 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
         metrics = self.monitor.fetch_runner_metrics(runner_info)
         self.assertIsNone(metrics)
 
-    @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'cloudwatch')
-    def test_publish_metrics_to_cloudwatch(self, mock_cloudwatch):
+    def test_publish_metrics_to_cloudwatch(self):
         """Test CloudWatch metrics publishing"""
         runner_info = {
             'cluster_name': 'test-cluster',
             'service_name': 'test-service',
+            'task_arn': 'arn:aws:ecs:region:account:task/test-cluster/abc123',
             'agent_id': 'agent-001'
         }
         
@@ -197,10 +333,13 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
             'agentStatus': 'RUNNING'
         }
         
-        self.monitor.publish_metrics_to_cloudwatch(runner_info, metrics_data)
+        with patch.object(self.monitor, 'cloudwatch') as mock_cloudwatch:
+            metric_data = self.monitor.build_metric_data(runner_info, metrics_data)
+            published = self.monitor.publish_metrics_to_cloudwatch(metric_data)
         
         # Verify CloudWatch put_metric_data was called
         mock_cloudwatch.put_metric_data.assert_called_once()
+        self.assertEqual(published, 4)
         
         # Check the call arguments
         call_args = mock_cloudwatch.put_metric_data.call_args
@@ -221,32 +360,72 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
             dimensions = {d['Name']: d['Value'] for d in metric['Dimensions']}
             self.assertEqual(dimensions['ClusterName'], 'test-cluster')
             self.assertEqual(dimensions['ServiceName'], 'test-service')
+            self.assertEqual(dimensions['TaskId'], 'abc123')
             self.assertEqual(dimensions['RunnerId'], 'agent-001')
 
+    def test_publish_metrics_batches_at_1000(self):
+        """Test metrics are published in PutMetricData batches of at most 1000 datums"""
+        metric_data = [
+            {'MetricName': 'ActiveTaskCount', 'Value': float(i), 'Unit': 'Count'}
+            for i in range(1500)
+        ]
+
+        with patch.object(self.monitor, 'cloudwatch') as mock_cloudwatch:
+            published = self.monitor.publish_metrics_to_cloudwatch(metric_data)
+
+        self.assertEqual(mock_cloudwatch.put_metric_data.call_count, 2)
+        batch_sizes = [len(call[1]['MetricData']) for call in mock_cloudwatch.put_metric_data.call_args_list]
+        self.assertEqual(batch_sizes, [1000, 500])
+        self.assertEqual(published, 1500)
+
+    def test_put_metric_data_requests_are_gzipped(self):
+        """Test PutMetricData bodies are sent gzip-compressed by the shared client config"""
+        cloudwatch = lambda_function.boto3.client(
+            'cloudwatch', region_name='us-east-1', aws_access_key_id='testing',
+            aws_secret_access_key='testing', config=lambda_function._boto_config
+        )
+        sent_headers = {}
+
+        class RequestCaptured(Exception):
+            pass
+
+        def capture_request(request, **kwargs):
+            sent_headers.update(request.headers)
+            raise RequestCaptured()
+
+        cloudwatch.meta.events.register('before-send.cloudwatch.PutMetricData', capture_request)
+        self.monitor.cloudwatch = cloudwatch
+
+        runner_info = {
+            'cluster_name': 'test-cluster',
+            'service_name': 'test-service',
+            'task_arn': 'arn:aws:ecs:region:account:task/test-cluster/abc123',
+            'agent_id': 'agent-001'
+        }
+        metric_data = self.monitor.build_metric_data(runner_info, {'activeTaskCount': 1, 'agentStatus': 'RUNNING'})
+
+        self.monitor.publish_metrics_to_cloudwatch(metric_data * 10)  # Publish errors are logged, not raised
+
+        self.assertIn(sent_headers.get('Content-Encoding'), (b'gzip', 'gzip'))
+
     def test_publish_metrics_agent_status_values(self):
         """Test agent status metric value conversion"""
-        with patch.object(self.monitor, 'cloudwatch') as mock_cloudwatch:
-            runner_info = {
-                'cluster_name': 'test-cluster',
-                'service_name': 'test-service',
-                'agent_id': 'agent-001'
-            }
-            
-            # Test RUNNING status
-            metrics_data = {'agentStatus': 'RUNNING'}
-            self.monitor.publish_metrics_to_cloudwatch(runner_info, metrics_data)
-            
-            call_args = mock_cloudwatch.put_metric_data.call_args
-            runner_status_metric = next(m for m in call_args[1]['MetricData'] if m['MetricName'] == 'RunnerStatus')
-            self.assertEqual(runner_status_metric['Value'], 1.0)
-            
-            # Test non-RUNNING status
-            metrics_data = {'agentStatus': 'STOPPED'}
-            self.monitor.publish_metrics_to_cloudwatch(runner_info, metrics_data)
-            
-            call_args = mock_cloudwatch.put_metric_data.call_args
-            runner_status_metric = next(m for m in call_args[1]['MetricData'] if m['MetricName'] == 'RunnerStatus')
-            self.assertEqual(runner_status_metric['Value'], 0.0)
+        runner_info = {
+            'cluster_name': 'test-cluster',
+            'service_name': 'test-service',
+            'task_arn': 'arn:aws:ecs:region:account:task/test-cluster/abc123',
+            'agent_id': 'agent-001'
+        }
+        
+        # Test RUNNING status
+        metric_data = self.monitor.build_metric_data(runner_info, {'agentStatus': 'RUNNING'})
+        runner_status_metric = next(m for m in metric_data if m['MetricName'] == 'RunnerStatus')
+        self.assertEqual(runner_status_metric['Value'], 1.0)
+        
+        # Test non-RUNNING status
+        metric_data = self.monitor.build_metric_data(runner_info, {'agentStatus': 'STOPPED'})
+        runner_status_metric = next(m for m in metric_data if m['MetricName'] == 'RunnerStatus')
+        self.assertEqual(runner_status_metric['Value'], 0.0)
 
     @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'discover_runner_services')
     @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'fetch_runner_metrics')
@@ -258,12 +437,14 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
             {
                 'cluster_name': 'cluster1',
                 'service_name': 'service1',
+                'task_arn': 'arn:aws:ecs:region:account:task/cluster1/task1',
                 'agent_id': 'agent1',
                 'private_ip': '10.0.1.100'
             },
             {
                 'cluster_name': 'cluster2',
                 'service_name': 'service2',
+                'task_arn': 'arn:aws:ecs:region:account:task/cluster2/task2',
                 'agent_id': 'agent2',
                 'private_ip': '10.0.1.101'
             }
@@ -276,6 +457,7 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
             'openSessionsCount': 8,
             'agentStatus': 'RUNNING'
         }
+        mock_publish.side_effect = len
         
         # Run monitoring
         results = self.monitor.monitor_all_runners()
@@ -289,10 +471,14 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
         # Verify methods were called correctly
         mock_discover.assert_called_once()
         self.assertEqual(mock_fetch.call_count, 2)
-        self.assertEqual(mock_publish.call_count, 2)
+        
+        # Both runners' metrics are published in a single batch
+        mock_publish.assert_called_once()
+        self.assertEqual(len(mock_publish.call_args[0][0]), 8)
 
+    @patch.object(lambda_function, 'ThreadPoolExecutor')
     @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'discover_runner_services')
-    def test_monitor_all_runners_no_services(self, mock_discover):
+    def test_monitor_all_runners_no_services(self, mock_discover, mock_executor):
         """Test monitoring when no runner services are discovered"""
         mock_discover.return_value = []
         
@@ -301,15 +487,23 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
         self.assertEqual(results['runners_discovered'], 0)
         self.assertEqual(results['runners_monitored'], 0)
         self.assertEqual(results['metrics_published'], 0)
+        self.assertEqual(results['errors'], [])
+
+        # Nothing to fetch or publish, so no worker pool is started
+        mock_executor.assert_not_called()
+        self.monitor.cloudwatch.put_metric_data.assert_not_called()
 
     @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'discover_runner_services')
     @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'fetch_runner_metrics')
-    def test_monitor_all_runners_with_errors(self, mock_fetch, mock_discover):
+    @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'publish_metrics_to_cloudwatch')
+    def test_monitor_all_runners_with_errors(self, mock_publish, mock_fetch, mock_discover):
         """Test monitoring with some failures"""
         # Mock discovered runners
         mock_discover.return_value = [
-            {'agent_id': 'agent1'},
-            {'agent_id': 'agent2'}
+            {'cluster_name': 'cluster1', 'service_name': 'service1',
+             'task_arn': 'arn:aws:ecs:region:account:task/cluster1/task1', 'agent_id': 'agent1'},
+            {'cluster_name': 'cluster1', 'service_name': 'service1',
+             'task_arn': 'arn:aws:ecs:region:account:task/cluster1/task2', 'agent_id': 'agent2'}
         ]
         
         # Mock one success, one failure
@@ -317,13 +511,41 @@ class TestECSRunnerSaturationMonitor(unittest.TestCase):
             {'activeTaskCount': 5},  # Success
             None  # Failure
         ]
+        mock_publish.side_effect = len
         
         results = self.monitor.monitor_all_runners()
         
         self.assertEqual(results['runners_discovered'], 2)
         self.assertEqual(results['runners_monitored'], 1)  # Only one successful
+        self.assertEqual(results['metrics_published'], 2)  # ActiveTaskCount and RunnerStatus
         self.assertEqual(len(results['errors']), 0)  # fetch_runner_metrics returning None is not an error
 
+    @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'discover_runner_services')
+    @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'fetch_runner_metrics')
+    @patch.object(lambda_function.ECSRunnerSaturationMonitor, 'publish_metrics_to_cloudwatch')
+    def test_monitor_all_runners_parallel(self, mock_publish, mock_fetch, mock_discover):
+        """Test runner metrics are fetched concurrently rather than one runner at a time"""
+        mock_discover.return_value = [
+            {'cluster_name': 'cluster1', 'service_name': 'service1',
+             'task_arn': f'arn:aws:ecs:region:account:task/cluster1/task{i}', 'agent_id': f'agent{i}'}
+            for i in range(10)
+        ]
+
+        def slow_fetch(runner_info):
+            time.sleep(0.2)
+            return {'activeTaskCount': 5}
+
+        mock_fetch.side_effect = slow_fetch
+        mock_publish.side_effect = len
+
+        start = time.monotonic()
+        results = self.monitor.monitor_all_runners()
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(results['runners_monitored'], 10)
+        self.assertEqual(results['errors'], [])
+        self.assertLess(elapsed, 1.5)  # Sequential fetching would take at least 2s
+
 
 class TestLambdaHandler(unittest.TestCase):
     """Test the Lambda handler function"""
@@ -87,6 +87,16 @@ variable "deployment_mode" {
   }
 }
 
+variable "fetch_concurrency" {
+  description = "Maximum number of runner tasks probed concurrently per invocation"
+  type        = number
+  default     = 32
+  validation {
+    condition     = var.fetch_concurrency >= 1 && floor(var.fetch_concurrency) == var.fetch_concurrency
+    error_message = "Fetch concurrency must be a whole number of at least 1."
+  }
+}
+
 variable "create_internet_access_rules" {
   description = "Whether to create security group rules allowing internet access to runner ports (needed for public runners)"
   type        = bool
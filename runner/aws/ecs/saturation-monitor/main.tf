@@ -30,6 +30,7 @@ module "saturation_monitor" {
   vpc_config                       = var.vpc_config
   create_vpc_endpoints             = var.create_vpc_endpoints
   deployment_mode                  = var.deployment_mode
+  fetch_concurrency                = var.fetch_concurrency
   create_internet_access_rules     = var.create_internet_access_rules
   vpc_endpoint_private_dns_enabled = var.vpc_endpoint_private_dns_enabled
 }
\ No newline at end of file
@@ -7,6 +7,11 @@ def pytest_configure(config):
     if not shutil.which('helm'):
         pytest.exit("Helm is not installed or not in PATH")
 
+    # Renders are cached per process, so under pytest-xdist (`pytest -n auto --dist loadgroup
+    # tests/helm`) tests that render the same values are grouped onto one worker. Registered
+    # here so the marker is still known when xdist isn't installed.
+    config.addinivalue_line("markers", "xdist_group(name): run all tests in the group on one xdist worker")
+
 @pytest.fixture(scope="session")
 def helm_version():
     """Get Helm version for compatibility checks"""
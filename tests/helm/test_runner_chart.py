@@ -1,75 +1,124 @@
 #!/usr/bin/env python3
+import copy
+import functools
+import hashlib
+import json
 import yaml
 import subprocess
 import pytest
-import os
 
-class TestRunnerChart:
-    @pytest.fixture
-    def base_values(self):
-        return {
-            'cloudProvider': 'aws',
-            'config': {
-                'oauthClientId': 'test-client-id',
-                'oauthClientSecret': 'test-client-secret'
-            },
-            'serviceAccount': {
-                'roleArn': 'arn:aws:iam::123456789012:role/test-role'
-            },
-            'dpcAgent': {
-                'dpcAgent': {
-                    'env': {
-                        'accountId': '12345',
-                        'agentId': 'test-agent-id',
-                        'matillionRegion': 'us1'
-                    },
-                    'image': {
-                        'repository': 'nginx',
-                        'tag': 'latest'
-                    }
-                }
+# libyaml's C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+BASE_VALUES = {
+    'cloudProvider': 'aws',
+    'config': {
+        'oauthClientId': 'test-client-id',
+        'oauthClientSecret': 'test-client-secret'
+    },
+    'serviceAccount': {
+        'roleArn': 'arn:aws:iam::123456789012:role/test-role'
+    },
+    'dpcAgent': {
+        'dpcAgent': {
+            'env': {
+                'accountId': '12345',
+                'agentId': 'test-agent-id',
+                'matillionRegion': 'us1'
             },
-            'hpa': {
-                'maxReplicas': 10,
-                'metrics': {
-                    'target': {
-                        'averageValue': '50'
-                    }
-                }
+            'image': {
+                'repository': 'nginx',
+                'tag': 'latest'
             }
         }
+    },
+    'hpa': {
+        'maxReplicas': 10,
+        'metrics': {
+            'target': {
+                'averageValue': '50'
+            }
+        }
+    }
+}
 
-    def helm_template(self, values, chart_path='runner/helm/runner'):
-        """Helper to render Helm templates with given values"""
-        import tempfile
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(values, f)
-            values_file = f.name
+class RenderedDocuments(tuple):
+    """Rendered documents in helm's output order, also indexed by kind"""
+
+    def __new__(cls, documents):
+        self = super().__new__(cls, documents)
+        self.by_kind = {}
+        for doc in self:
+            self.by_kind.setdefault(doc.get('kind'), []).append(doc)
+        return self
+
+
+# Parsed documents by digest of helm's output, so values that render identical manifests
+# (e.g. ones that only differ in keys the chart ignores) share one parse
+_parsed_documents = {}
+
+
+def _parse_documents(manifest):
+    """Parse helm's multi-document output, reusing the result for identical output"""
+    digest = hashlib.blake2b(manifest.encode(), digest_size=16).digest()
+    documents = _parsed_documents.get(digest)
+    if documents is None:
+        documents = RenderedDocuments(
+            doc for doc in yaml.load_all(manifest, Loader=SafeLoader) if doc is not None
+        )
+        _parsed_documents[digest] = documents
+    return documents
+
+
+@functools.lru_cache(maxsize=32)
+def _render_chart(chart_path, values_json):
+    """Render a chart once per distinct set of values. The parsed documents are
+    shared between every test that renders the same values, so treat them as
+    read-only."""
+    # Values go to helm on stdin (`-f -`) rather than through a temporary file. JSON is
+    # valid YAML, so the cache key is passed as-is instead of being re-serialized.
+    result = subprocess.run([
+        'helm', 'template', 'test-release', chart_path,
+        '-f', '-'
+    ], input=values_json, capture_output=True, text=True, check=True)
+
+    return _parse_documents(result.stdout)
+
+
+@pytest.fixture(scope="session")
+def base_documents():
+    """Chart rendered with BASE_VALUES, for tests that don't change any values"""
+    return _render_chart('runner/helm/runner', json.dumps(BASE_VALUES, sort_keys=True))
+
 
-        try:
-            result = subprocess.run([
-                'helm', 'template', 'test-release', chart_path,
-                '-f', values_file
-            ], capture_output=True, text=True, check=True)
+@pytest.mark.xdist_group("runner-chart")
+class TestRunnerChart:
+    @pytest.fixture
+    def base_values(self):
+        return copy.deepcopy(BASE_VALUES)
 
-            # Parse YAML documents
-            documents = list(yaml.safe_load_all(result.stdout))
-            return [doc for doc in documents if doc is not None]
-        finally:
-            os.unlink(values_file)
+    def helm_template(self, values, chart_path='runner/helm/runner'):
+        """Helper to render Helm templates with given values (cached by values)"""
+        return _render_chart(chart_path, json.dumps(values, sort_keys=True))
 
     def find_document_by_kind(self, documents, kind, name=None):
         """Find a specific Kubernetes resource by kind and optionally name"""
-        for doc in documents:
-            if doc.get('kind') == kind:
-                if name is None or doc.get('metadata', {}).get('name', '').endswith(name):
-                    return doc
+        for doc in documents.by_kind.get(kind, ()):
+            if name is None or doc.get('metadata', {}).get('name', '').endswith(name):
+                return doc
         return None
 
-    def test_deployment_has_main_container(self, base_values):
+    def find_env_var(self, container, name):
+        """Find a container environment variable entry by name"""
+        return next((env for env in container.get('env', ()) if env['name'] == name), None)
+
+    def test_deployment_has_main_container(self, base_documents):
         """Test that deployment has the main runner container"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         assert deployment is not None
@@ -82,18 +131,18 @@ class TestRunnerChart:
         assert main_container['name'].endswith('-pods')
         assert main_container['image'] == 'nginx:latest'
 
-    def test_runner_exposes_metrics_port(self, base_values):
+    def test_runner_exposes_metrics_port(self, base_documents):
         """Test that the runner container exposes the metrics port directly"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         main_container = deployment['spec']['template']['spec']['containers'][0]
         assert main_container['ports'][0]['containerPort'] == 8080
         assert main_container['ports'][0]['name'] == 'metrics'
 
-    def test_prometheus_annotations(self, base_values):
+    def test_prometheus_annotations(self, base_documents):
         """Test Prometheus scraping annotations point to native actuator endpoint"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         annotations = deployment['spec']['template']['metadata']['annotations']
@@ -101,17 +150,16 @@ class TestRunnerChart:
         assert annotations['prometheus.io/port'] == '8080'
         assert annotations['prometheus.io/path'] == '/actuator/prometheus'
 
-    def test_environment_variables(self, base_values):
+    def test_environment_variables(self, base_documents):
         """Test that required environment variables are set"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         main_container = deployment['spec']['template']['spec']['containers'][0]
-        env_vars = {env['name']: env['value'] for env in main_container['env']}
 
-        assert env_vars['ACCOUNT_ID'] == '12345'
-        assert env_vars['AGENT_ID'] == 'test-agent-id'
-        assert env_vars['MATILLION_REGION'] == 'us1'
+        assert self.find_env_var(main_container, 'ACCOUNT_ID')['value'] == '12345'
+        assert self.find_env_var(main_container, 'AGENT_ID')['value'] == 'test-agent-id'
+        assert self.find_env_var(main_container, 'MATILLION_REGION')['value'] == 'us1'
 
     def test_replica_count(self, base_values):
         """Test replica count is configurable"""
@@ -122,12 +170,12 @@ class TestRunnerChart:
 
         assert deployment['spec']['replicas'] == 3
 
-    def test_image_pull_policy(self, base_values):
+    def test_image_pull_policy(self, base_documents):
         """Default is 'Always' (CKV_K8S_15 — kubelet re-validates with the
         registry on every pod start, catches replaced upstream images and
         revoked pull perms). Previously hardcoded, but customers / test
         environments can now legitimately override via the values entry."""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         main_container = deployment['spec']['template']['spec']['containers'][0]
@@ -144,12 +192,12 @@ class TestRunnerChart:
         main_container = deployment['spec']['template']['spec']['containers'][0]
         assert main_container['imagePullPolicy'] == 'Never'
 
-    def test_proxy_and_location_placeholders_dont_leak(self, base_values):
+    def test_proxy_and_location_placeholders_dont_leak(self, base_documents):
         """The chart's <ProxyHttp> / <ExtensionLibraryLocation> placeholder
         strings used to land in the container verbatim, crashing the agent's
         Spring proxy parser and looping on S3 `Invalid bucket name` errors.
         Defaults are now empty strings; only non-empty overrides are passed."""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
         env = deployment['spec']['template']['spec']['containers'][0].get('env', [])
         env_map = {e['name']: e.get('value', '') for e in env}
@@ -166,17 +214,17 @@ class TestRunnerChart:
                 f'values.yaml defaults must be "" (or the env injection must be guarded).'
             )
 
-    def test_service_account(self, base_values):
+    def test_service_account(self, base_documents):
         """Test service account is properly referenced"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         service_account = deployment['spec']['template']['spec']['serviceAccountName']
         assert service_account.endswith('-sa')
 
-    def test_labels_and_selectors(self, base_values):
+    def test_labels_and_selectors(self, base_documents):
         """Test that labels and selectors are consistent"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         # Check selector matches template labels
@@ -199,13 +247,12 @@ class TestRunnerChart:
         assert '<AgentImageTag>' in main_container['image']
 
         # Environment variables should also contain placeholders
-        env_vars = {env['name']: env['value'] for env in main_container['env']}
-        assert env_vars['ACCOUNT_ID'] == '<MatillionAccountId>'
-        assert env_vars['AGENT_ID'] == '<MatillionAgentId>'
+        assert self.find_env_var(main_container, 'ACCOUNT_ID')['value'] == '<MatillionAccountId>'
+        assert self.find_env_var(main_container, 'AGENT_ID')['value'] == '<MatillionAgentId>'
 
-    def test_hpa_configuration(self, base_values):
+    def test_hpa_configuration(self, base_documents):
         """Test HPA is properly configured when enabled"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
 
         # Note: HPA might be in a separate template file
         # This test assumes HPA is included in the chart
@@ -215,9 +262,9 @@ class TestRunnerChart:
             assert hpa['spec']['maxReplicas'] == 10
             assert 'scaleTargetRef' in hpa['spec']
 
-    def test_config_secret_reference(self, base_values):
+    def test_config_secret_reference(self, base_documents):
         """Test that config secret is properly referenced"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
         deployment = self.find_document_by_kind(documents, 'Deployment')
 
         main_container = deployment['spec']['template']['spec']['containers'][0]
@@ -252,16 +299,18 @@ class TestRunnerChart:
         deployment = self.find_document_by_kind(documents, 'Deployment')
         main_container = deployment['spec']['template']['spec']['containers'][0]
 
-        env_vars = {env['name']: env.get('valueFrom', {}).get('secretKeyRef', {}).get('key')
-                   for env in main_container['env'] if env.get('valueFrom')}
-
-        assert env_vars.get('AWS_REGION') == 'aws-region'
-        assert env_vars.get('AWS_ACCESS_KEY_ID') == 'aws-access-key-id'
-        assert env_vars.get('AWS_SECRET_ACCESS_KEY') == 'aws-secret-access-key'
+        for name, key in (
+            ('AWS_REGION', 'aws-region'),
+            ('AWS_ACCESS_KEY_ID', 'aws-access-key-id'),
+            ('AWS_SECRET_ACCESS_KEY', 'aws-secret-access-key'),
+        ):
+            env = self.find_env_var(main_container, name)
+            assert env is not None, f'{name} is not set'
+            assert env.get('valueFrom', {}).get('secretKeyRef', {}).get('key') == key
 
-    def test_aws_role_based_auth_without_local(self, base_values):
+    def test_aws_role_based_auth_without_local(self, base_documents):
         """Test that role-based auth still works when local is disabled"""
-        documents = self.helm_template(base_values)
+        documents = base_documents
 
         service_account = self.find_document_by_kind(documents, 'ServiceAccount')
         assert service_account is not None
@@ -315,6 +364,7 @@ class TestRunnerChart:
         assert 'eks.amazonaws.com/role-arn' not in annotations
 
 
+@pytest.mark.xdist_group("script-runner")
 class TestScriptRunner:
     """Shared Script Runner (scriptRunner.*) — DPC-47328."""
 